@@ -1,3 +1,6 @@
+import os
+from pathlib import Path
+
 import numpy as np
 
 # this script creates two files:
@@ -11,21 +14,45 @@ import numpy as np
 # the first column is a list of seconds, with a step of 600 s (=10 min) for 31536000 s (=1 year)
 # the second column is a list of tide height: a harmonic function for a semi-diurnal tide with a mean height of 1.5 m
 
+# setup directory next to this script, or set the CVEG_SETUP environment variable
+setup_dir = Path(os.environ.get('CVEG_SETUP', Path(__file__).parent / 'setup'))
+
+
+def write_rows(fname, fmt, values):
+    """Write `values` to an ASCII file, formatting all rows at once.
+
+    `fmt` is the format of a single row (including the newline) and `values`
+    is the flattened table. Same rows as ``np.savetxt``, but without its
+    per-row Python loop: the table is encoded once and written to the file
+    in a single call. Lines always end in ``\\n``, also on Windows (where
+    ``np.savetxt`` writes ``\\r\\n``).
+    """
+    nrows = len(values) // fmt.count('%')
+    buf = ((fmt * nrows) % tuple(values)).encode('ascii')
+    with open(fname, 'wb') as f:
+        f.write(buf)
+
+
 # wind
+# wind speed and direction are constant, so they go straight into the row format
 t = np.arange(0, 31536000, 3600)
-wind_speed = np.full_like(t, 10)
-wind_dir = np.full_like(t, 0)
-wind = np.column_stack((t, wind_speed, wind_dir))
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\wind.txt', wind, fmt='%i %f %f')
+wind_speed = 10
+wind_dir = 0
+write_rows(setup_dir / 'wind.txt', '%%i %f %f\n' % (wind_speed, wind_dir), t.tolist())
 
 # tide
 t = np.arange(0, 31536000, 600)
-tide_height = 1.5 * np.sin(2 * np.pi * t / 44712)
-tide = np.column_stack((t, tide_height))
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\tide.txt', tide, fmt='%i %f')
+# compute the tide height in place, directly in the second column of the table
+tide = np.empty((len(t), 2))
+tide[:, 0] = t
+tide_height = tide[:, 1]
+np.multiply(t, 2 * np.pi, out=tide_height)
+tide_height /= 44712
+np.sin(tide_height, out=tide_height)
+tide_height *= 1.5
+write_rows(setup_dir / 'tide.txt', '%i %f\n', tide.ravel().tolist())
 
 # Plotting
 import matplotlib.pyplot as plt
 plt.plot(t, tide_height)
 plt.show()
-
@@ -1,34 +1,36 @@
 # This file only selects the middle three transects from the total 2D grid
-# Input files:
-# c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\x_old.grd
-# c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\y_old.grd
-# c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\z_old.grd
-# c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\veg_old.grd
-# c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\ne_old.grd
+# Input files (in the setup directory, see `setup_dir` below):
+# setup/x_old.grd
+# setup/y_old.grd
+# setup/z_old.grd
+# setup/veg_old.grd
+
+import os
+from pathlib import Path
 
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
 
-# Read in the x, y, z, veg, and ne grids
-x_o = np.loadtxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\x_old.grd')
-y_o = np.loadtxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\y_old.grd')
-z_o = np.loadtxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\z_old.grd')
-veg_o = np.loadtxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\veg_old.grd')
-ne_o = np.loadtxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\ne_old.grd')
-
-# Select the middle three transects
-x = x_o[5, :]
-y = y_o[5, :]
-z = z_o[5, :]
-veg = veg_o[5, :]
-ne = z_o[5, :] - 0.011
-
-# Write out the new grids
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\x.grd', x)
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\y.grd', y)
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\z.grd', z)
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\veg.grd', veg)
-np.savetxt(r'c:\Users\weste_bt\Github\csdms-coastal-vegetation\01_building_dunes\setup\ne.grd', ne)
+# setup directory next to this script, or set the CVEG_SETUP environment variable
+setup_dir = Path(os.environ.get('CVEG_SETUP', Path(__file__).parent / 'setup'))
+
+# Read in the x, y, z, and veg grids and select the middle transect
+# (only the rows up to the selected transect are parsed)
+row = 5
+x = np.loadtxt(setup_dir / 'x_old.grd', max_rows=row + 1)[row, :]
+y = np.loadtxt(setup_dir / 'y_old.grd', max_rows=row + 1)[row, :]
+z = np.loadtxt(setup_dir / 'z_old.grd', max_rows=row + 1)[row, :]
+veg = np.loadtxt(setup_dir / 'veg_old.grd', max_rows=row + 1)[row, :]
+
+# The non-erodible layer is set just below the bed, so ne_old.grd is not needed
+ne = z - 0.011
+
+# Write out the new grids (ASCII, as read by AeoLiS through aeolis.txt)
+np.savetxt(setup_dir / 'x.grd', x)
+np.savetxt(setup_dir / 'y.grd', y)
+np.savetxt(setup_dir / 'z.grd', z)
+np.savetxt(setup_dir / 'veg.grd', veg)
+np.savetxt(setup_dir / 'ne.grd', ne)
 
 
@@ -13,6 +13,118 @@ import pyDeltaRCM
 from pyDeltaRCM.shared_tools import sec_in_day, day_in_yr
 
 from scipy import ndimage
+from numba import njit, prange
+
+
+def _separable_kernel(kernel):
+    """Split a 2D kernel into 1D column and row factors, if possible.
+
+    The middle element may differ from the separable part (e.g., the
+    pyDeltaRCM `kernel2` is the 3x3 box with a zero middle). Returns
+    ``(col, row, center)`` such that `kernel` is ``np.outer(col, row)`` with
+    `center` subtracted from its middle element, or None if the kernel can
+    not be split this way.
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    m, n = kernel.shape[0] // 2, kernel.shape[1] // 2
+    if kernel[0, 0] == 0:
+        return None
+    # factor from the first column and row, which exclude the middle
+    col = kernel[:, 0]
+    row = kernel[0, :] / kernel[0, 0]
+    separable = np.outer(col, row)
+    center = separable[m, n] - kernel[m, n]
+    separable[m, n] = kernel[m, n]
+    if not np.allclose(separable, kernel):
+        return None
+    return col, row, center
+
+
+@njit(parallel=True)
+def _vegetation_mortality_kernel(veg_frac, eta_change, depth,
+                                 d_root, inv_d_root):
+    """Apply the vegetation mortality rules to `veg_frac` in place.
+
+    All rules are applied cell-by-cell in a single pass over the grid.
+    Cells without vegetation are skipped, and cells are only written when
+    their vegetation changes.
+    Mortality only scales `veg_frac` by a factor in [0, 1), so it can not
+    move it outside [0, 1].
+    """
+    for i in prange(veg_frac.shape[0]):
+        for j in range(veg_frac.shape[1]):
+            # no veg to kill or reduce (the common case), skip the cell
+            if veg_frac[i, j] == 0:
+                continue
+
+            _abs_eta_change = abs(eta_change[i, j])
+            # kill veg with bed *change* above root depth, or depth above 1 m
+            if (_abs_eta_change >= d_root) or (depth[i, j] > 1):
+                veg_frac[i, j] = 0
+            # reduce veg where there is bed change below root depth
+            elif _abs_eta_change > 0:
+                veg_frac[i, j] *= (1 - (_abs_eta_change * inv_d_root))
+
+
+@njit(parallel=True)
+def _vegetation_growth_kernel(veg_frac, eta_change, depth,
+                              dry_depth, est_depth, nochange_thresh,
+                              est_init, growth_rate, dry_establish):
+    """Apply vegetation establishment and growth to `veg_frac` in place.
+
+    If `dry_establish` is True, any dry cell can establish vegetation,
+    regardless of elevation change (see `_vegetation_growth`). The result
+    is clipped to [0, 1] in the same pass.
+    """
+    for i in prange(veg_frac.shape[0]):
+        for j in range(veg_frac.shape[1]):
+            # valid is {[(where dry) or (where (in wet window) and
+            #   (no change))] and (no veg)}, evaluated lazily per cell
+            _veg_frac = veg_frac[i, j]
+            _depth = depth[i, j]
+            if (_veg_frac == 0) and (
+                    (dry_establish and (_depth < dry_depth)) or
+                    ((_depth < est_depth) and
+                     (eta_change[i, j] < nochange_thresh))):
+                _veg_frac = est_init
+
+            # grow everywhere, including newly established vegetation
+            _veg_frac += growth_rate * (1 - _veg_frac) * _veg_frac
+
+            # cannot have vegetation fraction outside 0,1
+            veg_frac[i, j] = min(max(_veg_frac, 0.0), 1.0)
+
+
+@njit(parallel=True)
+def _topo_diffusion_kernel(eta, qs, veg_alpha_conv, kernel1, kernel2,
+                           diffusion_multiplier, cf):
+    """Compute the cross-diffusion flux `cf` in a single pass over the grid.
+
+    Equivalent to convolving `eta` with `kernel1`, and `qs` and `qs * eta`
+    with `kernel2` (3x3 kernels, zero outside the domain, as
+    ``ndimage.convolve(..., mode='constant')``), and then combining these
+    with the convolved `veg_alpha` into `cf`.
+    """
+    L, W = eta.shape
+    for i in prange(L):
+        for j in range(W):
+            a = 0.0
+            b = 0.0
+            c = 0.0
+            for p in range(3):
+                ii = i + 1 - p
+                if (ii < 0) or (ii >= L):
+                    continue
+                for q in range(3):
+                    jj = j + 1 - q
+                    if (jj < 0) or (jj >= W):
+                        continue
+                    a += kernel1[p, q] * eta[ii, jj]
+                    b += kernel2[p, q] * qs[ii, jj]
+                    c += kernel2[p, q] * qs[ii, jj] * eta[ii, jj]
+
+            cf[i, j] = (veg_alpha_conv[i, j] * diffusion_multiplier *
+                        (qs[i, j] * a - eta[i, j] * b + c))
 
 
 class VegetationModel(pyDeltaRCM.DeltaModel):
@@ -50,12 +162,20 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
            Letters, 45, 10437–10445. https://doi.org/10.1029/2018GL079405
     """
 
+    # number of `veg_frac` grids to buffer before writing to the netCDF file
+    _veg_frac_save_batch = 16
+
     def __init__(self, input_file, **kwargs):
 
         # requires pyDeltaRCM version where `mod_water_weight` is 
         #   implemented as a way to modify water routing.
         assert version.parse(pyDeltaRCM.__version__) >= version.parse("2.1.4")
 
+        # veg_frac grids waiting to be written to the netCDF file (set up
+        #   before the base model saves the initial conditions)
+        self._veg_frac_save_buffer = []
+        self._veg_frac_save_start = 0
+
         # inherit from base model
         super().__init__(input_file, **kwargs)
         self.hook_after_create_domain()
@@ -131,17 +251,66 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
                                            'f4', ('time',
                                                   'x', 'y')]
 
+    def save_grids(self, var_name, var, save_idx):
+        """Save a grid into the netCDF file, batching the `veg_frac` grids.
+
+        The `veg_frac` grids are buffered and written to the file
+        `_veg_frac_save_batch` at a time, to amortize the per-write netCDF
+        overhead. All other grids are saved as usual.
+        """
+        if var_name != 'veg_frac':
+            super().save_grids(var_name, var, save_idx)
+            return
+
+        # only contiguous save indices can be written as one block
+        if (self._veg_frac_save_buffer and
+                save_idx != (self._veg_frac_save_start +
+                             len(self._veg_frac_save_buffer))):
+            self._flush_veg_frac_save_buffer()
+
+        if not self._veg_frac_save_buffer:
+            self._veg_frac_save_start = save_idx
+        self._veg_frac_save_buffer.append(np.copy(var))
+
+        if len(self._veg_frac_save_buffer) >= self._veg_frac_save_batch:
+            self._flush_veg_frac_save_buffer()
+
+    def _flush_veg_frac_save_buffer(self):
+        """Write all buffered `veg_frac` grids to the netCDF file."""
+        if not self._veg_frac_save_buffer:
+            return
+
+        _start = self._veg_frac_save_start
+        _stop = _start + len(self._veg_frac_save_buffer)
+        self.output_netcdf.variables['veg_frac'][_start:_stop, :, :] = (
+            np.stack(self._veg_frac_save_buffer))
+        self._veg_frac_save_buffer = []
+
+    def save_the_checkpoint(self):
+        """Flush buffered `veg_frac` grids, then save the checkpoint."""
+        self._flush_veg_frac_save_buffer()
+        super().save_the_checkpoint()
+
+    def finalize(self):
+        """Flush buffered `veg_frac` grids, then finalize the model run."""
+        self._flush_veg_frac_save_buffer()
+        super().finalize()
+
     def hook_after_create_domain(self):
         """Add fields to the model for all vegetation parameterizations.
+
+        The vegetation fields are fractions and coefficients, so they are
+        stored as single precision (matching the `f4` output) to halve the
+        memory traffic of the per-timestep updates.
         """
-        self.veg_frac = np.zeros_like(self.depth)
-        self.veg_alpha = np.ones_like(self.depth)
+        self.veg_frac = np.zeros_like(self.depth, dtype=np.float32)
+        self.veg_alpha = np.ones_like(self.depth, dtype=np.float32)
         self.veg_d_root = self.p_veg_d_root
         self.veg_d_stem = self.p_veg_d_stem
         self.veg_K = self.p_veg_K
         self.veg_r = self.p_veg_r / (sec_in_day * day_in_yr)
 
-        self.eta_change = np.zeros_like(self.depth)
+        self.eta_change = np.zeros_like(self.depth, dtype=np.float32)
 
         self.veg_est_flood_duration = self.p_veg_est_flood_dur * sec_in_day  # duration of flooding
         self.veg_est_interflood_duration = self.p_veg_est_inter_dur * sec_in_day  # time for veg growth
@@ -159,34 +328,48 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
                       (np.pi * self.veg_d_stem**2 * self.veg_K * 
                        ((4 / self.veg_d_stem / self.veg_K) - self.veg_b)))
 
+        # vegetation roughness coefficient used to modify the water weights
+        self._veg_water_coeff = (
+            self.veg_A * np.pi * self.veg_d_stem**2 * self.veg_K)
+
+        # constants used every timestep by the mortality/growth rules
+        self._inv_veg_d_root = 1.0 / self.veg_d_root
+        self._veg_nochange_thresh = self.veg_est_roc * self.veg_d_root
+        self._veg_growth_rate = self.veg_est_interflood_duration * self.veg_r
+
+        # scratch grids reused by topo_diffusion on every call
+        self._veg_alpha_conv = np.empty_like(self.veg_alpha)
+        self._veg_alpha_conv_col = np.empty_like(self.veg_alpha)
+        self._kernel2_factors = _separable_kernel(self.kernel2)
+        self._where_edge = np.empty(self.depth.shape, dtype=bool)
+        self.cf = np.zeros_like(self.eta)
+
     def hook_run_water_iteration(self):
         """Update vegetation parameters before the water routing.
         """
         # determine the new alpha value based on vegetation density
         #   this is the how the "bank stability" described in the paper
         #   is implemented. See "topo_diffusion()" below
-        self.veg_alpha = -0.099 * self.veg_frac + 0.1
+        np.multiply(self.veg_frac, -0.099, out=self.veg_alpha)
+        self.veg_alpha += 0.1
 
         # This is the part that adds weighting to water routing based on
         # vegetation. The idea is that vegetation slows down flow by
         # increasing roughness. We use the self.mod_water_weight to
         # represent this change in flow resistence.
-        # First, determine what the weights would be everywhere
-        _part1 = (
-            self.veg_A * np.pi * self.veg_d_stem**2 * 
-            self.veg_K * (self.veg_frac - self.veg_b))
-        _mod_water_weight = (1 - (_part1 / 4))
-        # Then, we modulate the weights wherever the veg_frac is above threshold
-        #    reset everything to 1 (no weight), then update where veg above threshold
-        self.mod_water_weight[:] = 1
-        self.mod_water_weight[self.veg_frac >= self.veg_b] = _mod_water_weight[self.veg_frac >= self.veg_b]
-        self.mod_water_weight = np.clip(self.mod_water_weight, 0, 1)
+        # Determine what the weights would be everywhere, in place. Below
+        #    the veg_frac threshold the weight comes out above 1, so the
+        #    clip to [0, 1] also resets those cells to 1 (no weight).
+        np.subtract(self.veg_frac, self.veg_b, out=self.mod_water_weight)
+        self.mod_water_weight *= -(self._veg_water_coeff / 4)
+        self.mod_water_weight += 1
+        np.clip(self.mod_water_weight, 0, 1, out=self.mod_water_weight)
 
     def hook_after_route_sediment(self):
         """Apply vegetation growth/death rules.
         """
         # determine change in bed elevation on this timestep
-        self.eta_change = self.eta - self.eta0
+        np.subtract(self.eta, self.eta0, out=self.eta_change)
 
         # if vegetation is on, run the growth/death routines
         if self.vegetation:
@@ -204,30 +387,16 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
                 # reset the counter to start a new flood period
                 self.time_since_interflood = 0
 
-        # cannot have vegetation fraction outside 0,1
-        self.veg_frac = np.clip(self.veg_frac, 0, 1)
-
     def _vegetation_mortality(self):
         """Vegeation mortality method.
 
         This method implements vegetation mortality every timestep.
         """
-        # kill all veg that is in locations with bed *change* above root depth
-        self.veg_frac[np.abs(self.eta_change) >= self.veg_d_root] = 0
-        
-        # kill all veg anywhere the depth is greater than 1 m
-        self.veg_frac[self.depth > 1] = 0
-
-        # determine the new possible veg frac everywhere, based on elevation change
-        _possible_veg_mortality = (
-            self.veg_frac * (1 - (np.abs(self.eta_change) / self.veg_d_root)))
-        # determine where bed change could reduce vegetation
-        _where_eta_change = np.logical_and(
-            np.abs(self.eta_change) > 0,
-            np.abs(self.eta_change) < self.veg_d_root)
-        
-        # apply updated vegetation fraction
-        self.veg_frac[_where_eta_change] = _possible_veg_mortality[_where_eta_change] 
+        # kill veg where bed *change* is above root depth or depth is above
+        #   1 m, and reduce veg where there is bed change below root depth
+        _vegetation_mortality_kernel(
+            self.veg_frac, self.eta_change, self.depth,
+            self.veg_d_root, self._inv_veg_d_root)
         
     def _vegetation_growth(self):
         """Vegetation growth method.
@@ -243,14 +412,6 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
         """
         _veg_growth_flag = 'code'
 
-        # find where the elevation change is less than the threshold
-        _where_nochange = (self.eta_change < (self.veg_est_roc*self.veg_d_root))
-        # find where the depth of the cell is in the marsh window
-        _where_depth = (self.depth < self.veg_est_depth)
-        _where_depth_and_nochange = np.logical_and(_where_depth, _where_nochange)
-        # find where there is already no vegetation
-        _where_noveg = (self.veg_frac == 0)
-        
         if _veg_growth_flag == 'code':
             # This is my best interpretation of the Lauzon code.
             #
@@ -258,13 +419,9 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
             #   vegetation, regardless of elevation change. This differs
             #   from the description given in the paper, which indicats the cell
             #   wetness does not affect whether elevation-change threshold matters.
-
-            # find where dry or meeting depth and change criteria
-            _where_dry = (self.depth < self.dry_depth)
-            _where_dry_or_danc = np.logical_or(_where_dry, _where_depth_and_nochange)
-            
+            #
             # valid is {[(where dry) or (where (in wet window) and (no change))] and (no veg)}
-            _where_valid = np.logical_and(_where_dry_or_danc, _where_noveg)
+            _dry_establish = True
 
         if _veg_growth_flag == 'paper':
             # This is my best interpretation of the Lauzon paper description.
@@ -272,21 +429,19 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
             #   The paper indicates that the only thing that matters is the
             #   depth being in the window. There is no mention of the dry
             #   cells always being able to establish vegetation.
-
+            #
             # valid is {[where (in wet window) and (no change)] and (no veg)}
-            _where_valid = np.logical_and(_where_depth_and_nochange, _where_noveg)
+            _dry_establish = False
 
         # where it is valid to establish veg, and there is no veg already there
-        #  at these locations, establish with the initial vegetation parameter
-        self.veg_frac[_where_valid] = self.veg_est_init
-
-        # calculate the change in vegeation everywhere already vegetation
+        #  establish with the initial vegetation parameter, then calculate
+        #  the change in vegeation everywhere already vegetation
         #   note: this includes the newly established vegetation
         #   note: vegetation grows for length of an interflood period
-        dveg_frac = (
-            self.veg_est_interflood_duration *
-            (1-(self.veg_frac)) * self.veg_r * self.veg_frac)
-        self.veg_frac = self.veg_frac + dveg_frac
+        _vegetation_growth_kernel(
+            self.veg_frac, self.eta_change, self.depth,
+            self.dry_depth, self.veg_est_depth, self._veg_nochange_thresh,
+            self.veg_est_init, self._veg_growth_rate, _dry_establish)
         
         # update sea level rise during interflood time
         # note: it is critical to NOT scale sea level rise to intermittency
@@ -302,18 +457,36 @@ class VegetationModel(pyDeltaRCM.DeltaModel):
         with the `veg_alpha` coefficient field to determine topographic
         diffusion.
         """
-        for _ in range(self.N_crossdiff):
+        # veg_alpha does not change during the cross-diffusion iterations,
+        #   so it is convolved once, as two 1D passes if kernel2 allows
+        if self._kernel2_factors is None:
+            ndimage.convolve(self.veg_alpha, self.kernel2,
+                             output=self._veg_alpha_conv, mode='constant')
+        else:
+            _col, _row, _center = self._kernel2_factors
+            ndimage.convolve1d(self.veg_alpha, _col, axis=0,
+                               output=self._veg_alpha_conv_col,
+                               mode='constant')
+            ndimage.convolve1d(self._veg_alpha_conv_col, _row, axis=1,
+                               output=self._veg_alpha_conv, mode='constant')
+            if _center != 0:
+                np.multiply(self.veg_alpha, _center,
+                            out=self._veg_alpha_conv_col)
+                self._veg_alpha_conv -= self._veg_alpha_conv_col
+
+        # cell types do not change during the cross-diffusion iterations
+        np.equal(self.cell_type, -2, out=self._where_edge)
 
-            a = ndimage.convolve(self.eta, self.kernel1, mode='constant')
-            b = ndimage.convolve(self.qs, self.kernel2, mode='constant')
-            c = ndimage.convolve(self.qs * self.eta, self.kernel2,
-                                 mode='constant')
-            d = ndimage.convolve(self.veg_alpha, self.kernel2, mode='constant')
+        for _ in range(self.N_crossdiff):
 
-            self.cf = (d * self.diffusion_multiplier *
-                       (self.qs * a - self.eta * b + c))
+            # cf = d * diffusion_multiplier * (qs * a - eta * b + c), where
+            #   a, b, c are the eta, qs, and qs*eta convolutions
+            _topo_diffusion_kernel(
+                self.eta, self.qs, self._veg_alpha_conv,
+                self.kernel1, self.kernel2,
+                self.diffusion_multiplier, self.cf)
 
-            self.cf[self.cell_type == -2] = 0
+            np.copyto(self.cf, 0, where=self._where_edge)
             self.cf[0, :] = 0
 
             self.eta += self.cf